@@ -1,78 +1,512 @@
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
 import pandas as pd
 import numpy as np
-from collections import Counter
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict, List, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 import calendar
+import statistics
+from collections import Counter
 from io import BytesIO
-import base64
+import os
+import shelve
+import threading
+import time
+import weakref
+import dbm
+import pickle
+from email.utils import parsedate_to_datetime
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    import pybase64 as base64_mod
+except ImportError:
+    import base64 as base64_mod
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+SMALL_REPO_THRESHOLD = 500
+DAY_NAMES = tuple(calendar.day_name)
+GITHUB_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+COMMIT_HISTORY_QUERY = """
+query($login: String!, $count: Int!) {
+  repositoryOwner(login: $login) {
+    repositories(first: $count, ownerAffiliations: OWNER, privacy: PUBLIC,
+                 orderBy: {field: STARGAZERS, direction: DESC}) {
+      nodes {
+        name
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(first: 100) {
+                nodes { authoredDate }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.github_profile_analyzer_cache')
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _hist_times(hours: np.ndarray, weekdays: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Count commits per hour of day and per weekday in a single pass"""
+        hour_hist = np.zeros(24, np.int64)
+        day_hist = np.zeros(7, np.int64)
+        for i in range(hours.size):
+            hour_hist[hours[i]] += 1
+            day_hist[weekdays[i]] += 1
+        return hour_hist, day_hist
+else:
+    def _hist_times(hours: np.ndarray, weekdays: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Count commits per hour of day and per weekday"""
+        return np.bincount(hours, minlength=24), np.bincount(weekdays, minlength=7)
+
+class PNGImage(bytes):
+    """Raw PNG bytes that are only base64 encoded when converted to str"""
+
+    def __str__(self) -> str:
+        return base64_mod.b64encode(self).decode('ascii')
 
 class GitHubProfileAnalyzer:
-    def __init__(self, github_token: str = None):
+    def __init__(self, github_token: str = None, cache_path: str = DEFAULT_CACHE_PATH):
         """
         Initialize the GitHub Profile Analyzer.
         
         Args:
             github_token (str, optional): GitHub Personal Access Token for increased rate limits
+            cache_path (str, optional): On-disk ETag cache location, or None to disable caching
         """
         self.headers = {}
         if github_token:
             self.headers = {'Authorization': f'token {github_token}'}
         self.base_url = 'https://api.github.com'
+        self.max_workers = 8
+        self.max_retries = 3
+        # Longer waits (e.g. an exhausted hourly quota) raise instead of blocking
+        self.max_rate_limit_wait = 60
+        # Repo and page fan-outs nest executors, so in-flight requests are
+        # capped separately to keep every one on a pooled keep-alive connection
+        self.pool_size = 16
+        self._request_slots = threading.BoundedSemaphore(self.pool_size)
+        self.cache_path = cache_path
+        self._cache = None
+        self._cache_unavailable = False
+        self._cache_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'github-profile-analyzer'
+        })
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                              max_retries=retry)
+        self.session.mount('https://', adapter)
+        # 'seaborn' was renamed 'seaborn-v0_8' in matplotlib 3.6
+        plt.style.use('seaborn-v0_8' if 'seaborn-v0_8' in plt.style.available else 'seaborn')
 
-    def get_user_info(self, username: str) -> Dict[str, Any]:
-        response = requests.get(f'{self.base_url}/users/{username}', headers=self.headers)
+    def _cached_get(self, url: str, params: Dict[str, Any] = None,
+                    transform: Callable[[Any], Any] = None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Perform a conditional GET, serving the cached body on 304 Not Modified.
+
+        Args:
+            url (str): Endpoint URL
+            params (dict, optional): Query parameters
+            transform (callable, optional): Applied to the decoded body before
+                it is cached, so only the transformed result is stored
+
+        Returns:
+            tuple: (Decoded and transformed JSON body, parsed Link header)
+        """
+        key = requests.Request('GET', url, params=params).prepare().url
+        if transform is not None:
+            key = f'{key}#{transform.__qualname__}'
+        cached = self._cache_get(key)
+
+        headers = dict(self.headers)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+
+        response = self._request('get', url, params=params, headers=headers)
+
+        if response.status_code == 304 and cached:
+            return cached[1], cached[2]
         response.raise_for_status()
-        return response.json()
+        body = self._decode_json(response)
+        if transform is not None:
+            body = transform(body)
+        etag = response.headers.get('ETag')
+        if etag:
+            self._cache_set(key, (etag, body, response.links))
+        return body, response.links
 
-    def get_user_repos(self, username: str) -> List[Dict[str, Any]]:
-        repos = []
-        page = 1
-        while True:
-            response = requests.get(
-                f'{self.base_url}/users/{username}/repos',
-                params={'page': page, 'per_page': 100},
-                headers=self.headers
-            )
-            response.raise_for_status()
-            page_repos = response.json()
-            if not page_repos:
+    def _cache_get(self, key: str) -> Optional[Tuple[str, Any, Dict[str, Any]]]:
+        with self._cache_lock:
+            cache = self._open_cache()
+            if cache is None:
+                return None
+            try:
+                return cache.get(key)
+            except (OSError, *dbm.error, pickle.UnpicklingError, EOFError):
+                return None
+
+    def _cache_set(self, key: str, entry: Tuple[str, Any, Dict[str, Any]]):
+        with self._cache_lock:
+            cache = self._open_cache()
+            if cache is None:
+                return
+            try:
+                cache[key] = entry
+            except (OSError, *dbm.error):
+                pass
+
+    def _open_cache(self) -> Optional[shelve.Shelf]:
+        """
+        Open the ETag cache on first use; callers must hold _cache_lock.
+
+        The cache is held under an exclusive lock file so that two analyzers
+        (or processes) never write the same dbm files at once. If the lock is
+        taken or the cache cannot be opened, the analyzer runs uncached.
+
+        Returns:
+            Shelf: The open cache, or None if caching is unavailable
+        """
+        if self._cache is None and self.cache_path and not self._cache_unavailable:
+            lock_file = None
+            try:
+                if fcntl is not None:
+                    lock_file = open(f'{self.cache_path}.lock', 'a')
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._cache = shelve.open(self.cache_path)
+            except (OSError, *dbm.error):
+                if lock_file is not None:
+                    lock_file.close()
+                self._cache_unavailable = True
+                return None
+            self._close_cache = weakref.finalize(self, self._release_cache, self._cache, lock_file)
+        return self._cache
+
+    @staticmethod
+    def _release_cache(cache: shelve.Shelf, lock_file):
+        cache.close()
+        if lock_file is not None:
+            lock_file.close()
+
+    def close(self):
+        """Flush and close the ETag cache, releasing it to other analyzers"""
+        with self._cache_lock:
+            if self._cache is not None:
+                self._close_cache()
+                self._cache = None
+            self._cache_unavailable = False
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying while GitHub reports a short rate-limit wait.
+
+        A throttled request is only retried when another attempt remains and
+        the total wait stays within max_rate_limit_wait; otherwise the
+        throttled response is returned for the caller to raise on.
+
+        Args:
+            method (str): Session method name, 'get' or 'post'
+            url (str): Endpoint URL
+            **kwargs: Passed through to the session method
+
+        Returns:
+            requests.Response: The final response
+        """
+        waited = 0
+        for attempt in range(self.max_retries):
+            with self._request_slots:
+                response = getattr(self.session, method)(url, **kwargs)
+            if attempt == self.max_retries - 1:
                 break
-            repos.extend(page_repos)
-            page += 1
-        return repos
+            delay = self._rate_limit_delay(response)
+            if delay is None or waited + delay > self.max_rate_limit_wait:
+                break
+            time.sleep(delay)
+            waited += delay
+        return response
+
+    def _rate_limit_delay(self, response: requests.Response) -> Optional[float]:
+        """
+        Seconds to wait before retrying a throttled response.
+
+        Returns:
+            float: Delay in seconds, or None if the response was not rate limited
+        """
+        if response.status_code not in (403, 429):
+            return None
+        delay = self._parse_retry_after(response.headers.get('Retry-After'))
+        if delay is None:
+            if response.headers.get('X-RateLimit-Remaining') != '0':
+                return None
+            reset = int(response.headers.get('X-RateLimit-Reset', time.time()))
+            delay = max(reset - time.time(), 0) + 1
+        return delay
+
+    @staticmethod
+    def _decode_json(response: requests.Response) -> Any:
+        """Decode a JSON body, raising requests' JSONDecodeError like response.json()"""
+        try:
+            return json_loads(response.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(
+                getattr(e, 'msg', str(e)), getattr(e, 'doc', ''), getattr(e, 'pos', 0),
+                response=response
+            ) from e
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date), or None"""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(retry_at.timestamp() - time.time(), 0)
+
+    def get_user_info(self, username: str) -> Dict[str, Any]:
+        return self._cached_get(f'{self.base_url}/users/{username}')[0]
+
+    def _get_page(self, url: str, page: int, params: Dict[str, Any] = None,
+                  transform: Callable[[List[Any]], List[Any]] = None
+                  ) -> Tuple[List[Any], Dict[str, Any]]:
+        return self._cached_get(url, params={**(params or {}), 'page': page, 'per_page': 100},
+                                transform=transform)
 
-    def get_repo_commits(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
+    def _get_paginated(self, url: str, params: Dict[str, Any] = None,
+                       transform: Callable[[List[Any]], List[Any]] = None) -> List[Any]:
+        """
+        Fetch every page of a list endpoint.
+
+        The first page is requested on its own; if GitHub advertises a
+        ``rel="last"`` link, the remaining pages are fetched concurrently.
+        Otherwise ``rel="next"`` links are followed until there are none left.
+
+        Args:
+            url (str): Endpoint URL
+            params (dict, optional): Extra query parameters sent with every page
+            transform (callable, optional): Applied to each page before it is
+                cached; its results are collected instead of the raw items
+
+        Returns:
+            list: Items from all pages, in page order
+        """
+        items, links = self._get_page(url, 1, params, transform)
+        last = links.get('last')
+        if last:
+            last_page = int(parse_qs(urlparse(last['url']).query)['page'][0])
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pages = executor.map(lambda page: self._get_page(url, page, params, transform),
+                                     range(2, last_page + 1))
+                for page_items, _ in pages:
+                    items.extend(page_items)
+            return items
+        while 'next' in links:
+            page_items, links = self._cached_get(links['next']['url'], transform=transform)
+            items.extend(page_items)
+        return items
+
+    def get_user_repos(self, username: str) -> List[Dict[str, Any]]:
+        return self._get_paginated(
+            f'{self.base_url}/users/{username}/repos',
+            params={'type': 'owner', 'sort': 'updated', 'direction': 'desc'}
+        )
+
+    def get_repo_commits(self, username: str, repo_name: str,
+                         transform: Callable[[List[Any]], List[Any]] = None) -> List[Any]:
         """
         Get commits for a specific repository.
         
         Args:
             username (str): GitHub username
             repo_name (str): Repository name
+            transform (callable, optional): Applied to each page of commits,
+                e.g. to keep only the fields needed and drop the rest early
             
         Returns:
-            list: List of commits
+            list: List of commits, or of transformed items
         """
-        commits = []
-        page = 1
-        while True:
-            response = requests.get(
-                f'{self.base_url}/repos/{username}/{repo_name}/commits',
-                params={'page': page, 'per_page': 100},
-                headers=self.headers
-            )
-            if response.status_code == 409:  # Empty repository
+        try:
+            return self._get_paginated(f'{self.base_url}/repos/{username}/{repo_name}/commits',
+                                       transform=transform)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 409:  # Empty repository
                 return []
-            response.raise_for_status()
-            page_commits = response.json()
-            if not page_commits:
-                break
-            commits.extend(page_commits)
-            page += 1
-        return commits
+            raise
+
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a GraphQL v4 query. Requires a GitHub token.
+
+        Args:
+            query (str): GraphQL query document
+            variables (dict): Query variables
+
+        Returns:
+            dict: The ``data`` member of the response
+        """
+        response = self._request(
+            'post',
+            f'{self.base_url}/graphql',
+            json={'query': query, 'variables': variables},
+            headers=self.headers
+        )
+        response.raise_for_status()
+        payload = self._decode_json(response)
+        if payload.get('errors'):
+            raise requests.exceptions.RequestException(payload['errors'][0]['message'],
+                                                       response=response)
+        return payload['data']
+
+    def get_commit_dates(self, username: str, repos: List[Dict[str, Any]],
+                         limit: int = 5) -> pd.DatetimeIndex:
+        """
+        Get commit timestamps (UTC, tz-naive) for the owner's top repositories.
+
+        With a token, the latest 100 commits of the top starred repositories
+        are fetched in a single GraphQL request. Anonymous clients cannot use
+        GraphQL and fall back to the REST commit listing of the ``limit`` most
+        starred entries of ``repos``.
+
+        Args:
+            username (str): GitHub user or organization login
+            repos (list): Repositories as returned by get_user_repos
+            limit (int): Number of repositories to analyze
+
+        Returns:
+            DatetimeIndex: Commit timestamps
+        """
+        if self.headers:
+            data = self._graphql(COMMIT_HISTORY_QUERY, {'login': username, 'count': limit})
+            # repositoryOwner resolves both users and organizations
+            owner = data['repositoryOwner'] or {'repositories': {'nodes': []}}
+            dates = [commit['authoredDate']
+                     for repo in owner['repositories']['nodes']
+                     if repo['defaultBranchRef']
+                     for commit in repo['defaultBranchRef']['target']['history']['nodes']]
+            # authoredDate keeps the author's UTC offset; normalize to match REST
+            return pd.to_datetime(dates, utc=True, cache=True).tz_localize(None)
+
+        top_repos = sorted(repos, key=lambda repo: repo['stargazers_count'], reverse=True)[:limit]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            repo_dates = list(executor.map(
+                lambda repo: self.get_repo_commits(username, repo['name'],
+                                                   transform=self._commit_dates),
+                top_repos))
+        return pd.to_datetime([date for dates in repo_dates for date in dates],
+                              format=GITHUB_DATE_FORMAT, cache=True)
+
+    @staticmethod
+    def _commit_dates(commits: List[Dict[str, Any]]) -> List[str]:
+        """Extract author dates from a page of REST commits"""
+        return [commit['commit']['author']['date'] for commit in commits
+                if commit.get('commit', {}).get('author', {}).get('date')]
+
+    def _summarize_repos(self, repos: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Aggregate repository statistics in a single pass over ``repos``.
+
+        Counters and raw values are collected in one loop. The derived size
+        and date statistics are then computed in plain Python for the few
+        hundred repositories a typical profile has, where the fixed overhead
+        of numpy/pandas does not pay off, and vectorized above
+        SMALL_REPO_THRESHOLD. GitHub timestamps are ISO-8601 strings, so the
+        plain Python path compares and slices them without parsing.
+
+        Args:
+            repos (list): Repositories as returned by get_user_repos
+
+        Returns:
+            dict: Repository totals, distributions and activity dates
+        """
+        total_stars = total_forks = total_watchers = 0
+        languages = Counter()
+        licenses = Counter()
+        repo_sizes = []
+        creation_dates = []
+        update_dates = []
+        for repo in repos:
+            total_stars += repo['stargazers_count']
+            total_forks += repo['forks_count']
+            total_watchers += repo['watchers_count']
+            if repo['language']:
+                languages[repo['language']] += 1
+            license_name = (repo.get('license') or {}).get('name')
+            if license_name:
+                licenses[license_name] += 1
+            repo_sizes.append(repo['size'])
+            creation_dates.append(repo['created_at'])
+            update_dates.append(repo['updated_at'])
+
+        summary = {
+            'total_stars': total_stars,
+            'total_forks': total_forks,
+            'total_watchers': total_watchers,
+            'top_languages': dict(languages.most_common(10)),
+            'licenses': dict(licenses.most_common(5))
+        }
+
+        if len(repos) < SMALL_REPO_THRESHOLD:
+            quarters = Counter(f"{date[:4]}-Q{(int(date[5:7]) - 1) // 3 + 1}"
+                               for date in update_dates)
+            summary.update({
+                'repo_sizes': repo_sizes,
+                'avg_repo_size': statistics.fmean(repo_sizes) if repos else 0,
+                'median_repo_size': statistics.median(repo_sizes) if repos else 0,
+                'newest_repo': max(creation_dates)[:10] if repos else None,
+                'oldest_repo': min(creation_dates)[:10] if repos else None,
+                'last_update': max(update_dates)[:10] if repos else None,
+                'updates_per_quarter': dict(sorted(quarters.items()))
+            })
+            return summary
+
+        sizes = np.asarray(repo_sizes, dtype=np.int32)
+        creation_dates = pd.to_datetime(creation_dates, format=GITHUB_DATE_FORMAT, cache=True)
+        update_dates = pd.to_datetime(update_dates, format=GITHUB_DATE_FORMAT, cache=True)
+        quarters = update_dates.to_period('Q').value_counts().sort_index()
+        summary.update({
+            'repo_sizes': sizes,
+            'avg_repo_size': sizes.mean(),
+            'median_repo_size': self._median(sizes),
+            'newest_repo': creation_dates.max().strftime('%Y-%m-%d'),
+            'oldest_repo': creation_dates.min().strftime('%Y-%m-%d'),
+            'last_update': update_dates.max().strftime('%Y-%m-%d'),
+            'updates_per_quarter': {f"{period.year}-Q{period.quarter}": int(count)
+                                    for period, count in quarters.items()}
+        })
+        return summary
 
     def analyze_profile(self, username: str) -> Dict[str, Any]:
         """
@@ -89,41 +523,14 @@ class GitHubProfileAnalyzer:
         repos = self.get_user_repos(username)
 
         # Analyze repositories
-        total_stars = sum(repo['stargazers_count'] for repo in repos)
-        total_forks = sum(repo['forks_count'] for repo in repos)
-        total_watchers = sum(repo['watchers_count'] for repo in repos)
-        languages = Counter(repo['language'] for repo in repos if repo['language'])
-        
-        # Repository size analysis
-        repo_sizes = [repo['size'] for repo in repos]
-        
-        # License analysis
-        licenses = Counter(repo.get('license', {}).get('name') for repo in repos if repo.get('license'))
+        repo_summary = self._summarize_repos(repos)
+        total_stars = repo_summary['total_stars']
         
         # Analyze commit patterns
-        commit_times = []
-        commit_days = []
-        for repo in repos[:5]:  # Analyze top 5 repos for performance
-            commits = self.get_repo_commits(username, repo['name'])
-            for commit in commits:
-                if commit.get('commit', {}).get('author', {}).get('date'):
-                    commit_date = datetime.strptime(
-                        commit['commit']['author']['date'],
-                        '%Y-%m-%dT%H:%M:%SZ'
-                    )
-                    commit_times.append(commit_date.hour)
-                    commit_days.append(commit_date.weekday())
-
-        # Calculate activity patterns
-        creation_dates = [datetime.strptime(repo['created_at'], '%Y-%m-%dT%H:%M:%SZ') 
-                         for repo in repos]
-        update_dates = [datetime.strptime(repo['updated_at'], '%Y-%m-%dT%H:%M:%SZ') 
-                       for repo in repos]
-        
-        # Calculate quarterly activity
-        quarters = Counter()
-        for date in update_dates:
-            quarters[f"{date.year}-Q{(date.month-1)//3 + 1}"] += 1
+        commit_dates = self.get_commit_dates(username, repos)
+        commit_hours = commit_dates.hour.to_numpy().astype(np.int8)
+        commit_days = commit_dates.weekday.to_numpy().astype(np.int8)
+        hour_hist, day_hist = _hist_times(commit_hours, commit_days)
         
         # Enhanced analysis results
         analysis = {
@@ -141,33 +548,49 @@ class GitHubProfileAnalyzer:
             'repository_stats': {
                 'total_repos': len(repos),
                 'total_stars': total_stars,
-                'total_forks': total_forks,
-                'total_watchers': total_watchers,
-                'top_languages': dict(languages.most_common(10)),
+                'total_forks': repo_summary['total_forks'],
+                'total_watchers': repo_summary['total_watchers'],
+                'top_languages': repo_summary['top_languages'],
                 'avg_stars_per_repo': total_stars / len(repos) if repos else 0,
-                'avg_repo_size': np.mean(repo_sizes) if repo_sizes else 0,
-                'median_repo_size': np.median(repo_sizes) if repo_sizes else 0,
-                'licenses': dict(licenses.most_common(5))
+                'avg_repo_size': repo_summary['avg_repo_size'],
+                'median_repo_size': repo_summary['median_repo_size'],
+                'repo_sizes': repo_summary['repo_sizes'],
+                'licenses': repo_summary['licenses']
             },
             'activity_patterns': {
-                'newest_repo': max(creation_dates).strftime('%Y-%m-%d'),
-                'oldest_repo': min(creation_dates).strftime('%Y-%m-%d'),
-                'last_update': max(update_dates).strftime('%Y-%m-%d'),
-                'updates_per_quarter': dict(quarters.most_common()),
-                'favorite_commit_hours': Counter(commit_times).most_common(3),
-                'favorite_commit_days': Counter(commit_days).most_common(),
+                'newest_repo': repo_summary['newest_repo'],
+                'oldest_repo': repo_summary['oldest_repo'],
+                'last_update': repo_summary['last_update'],
+                'updates_per_quarter': repo_summary['updates_per_quarter'],
+                'favorite_commit_hours': self._most_common(hour_hist, 3),
+                'favorite_commit_days': self._most_common(day_hist),
                 'commit_frequency': {
-                    'morning': len([h for h in commit_times if 5 <= h < 12]),
-                    'afternoon': len([h for h in commit_times if 12 <= h < 17]),
-                    'evening': len([h for h in commit_times if 17 <= h < 22]),
-                    'night': len([h for h in commit_times if h >= 22 or h < 5])
+                    'morning': int(hour_hist[5:12].sum()),
+                    'afternoon': int(hour_hist[12:17].sum()),
+                    'evening': int(hour_hist[17:22].sum()),
+                    'night': int(hour_hist[22:].sum() + hour_hist[:5].sum())
                 }
             }
         }
         
         return analysis
 
-    def generate_visualizations(self, analysis: Dict[str, Any]) -> Dict[str, str]:
+    @staticmethod
+    def _median(values: np.ndarray) -> float:
+        """Median of a non-empty array via O(n) partial sort"""
+        mid = values.size // 2
+        if values.size % 2:
+            return float(np.partition(values, mid)[mid])
+        lower, upper = np.partition(values, [mid - 1, mid])[mid - 1:mid + 1]
+        return (float(lower) + float(upper)) / 2
+
+    @staticmethod
+    def _most_common(histogram: np.ndarray, n: int = None) -> List[Tuple[int, int]]:
+        """Return (bin, count) pairs for non-empty bins, most frequent first"""
+        order = np.argsort(-histogram, kind='stable')[:n]
+        return [(int(i), int(histogram[i])) for i in order if histogram[i]]
+
+    def generate_visualizations(self, analysis: Dict[str, Any]) -> Dict[str, PNGImage]:
         """
         Generate visualizations based on the analysis data.
         
@@ -175,58 +598,65 @@ class GitHubProfileAnalyzer:
             analysis (dict): Analysis data from analyze_profile
             
         Returns:
-            dict: Dictionary of base64 encoded plot images
+            dict: Dictionary of PNG plot images; str() of an image gives its base64 encoding
         """
         plots = {}
-        
-        # Set style for all plots
-        plt.style.use('seaborn')
+        fig, ax = plt.subplots(figsize=(10, 6))
         
         # 1. Language Distribution Pie Chart
-        plt.figure(figsize=(10, 6))
         languages = analysis['repository_stats']['top_languages']
-        plt.pie(languages.values(), labels=languages.keys(), autopct='%1.1f%%')
-        plt.title('Repository Language Distribution')
-        plots['language_distribution'] = self._fig_to_base64()
+        ax.pie(languages.values(), labels=languages.keys(), autopct='%1.1f%%')
+        ax.set_title('Repository Language Distribution')
+        plots['language_distribution'] = self._fig_to_png_bytes(fig)
 
         # 2. Commit Time Heatmap
-        plt.figure(figsize=(12, 4))
+        fig.clear()
+        ax = fig.add_subplot()
+        fig.set_size_inches(12, 4)
         commit_hours = analysis['activity_patterns']['commit_frequency']
         times = ['Morning\n(5-12)', 'Afternoon\n(12-17)', 'Evening\n(17-22)', 'Night\n(22-5)']
-        plt.bar(times, [commit_hours['morning'], commit_hours['afternoon'], 
-                       commit_hours['evening'], commit_hours['night']])
-        plt.title('Commit Activity by Time of Day')
-        plt.ylabel('Number of Commits')
-        plots['commit_time_distribution'] = self._fig_to_base64()
+        ax.bar(times, [commit_hours['morning'], commit_hours['afternoon'], 
+                      commit_hours['evening'], commit_hours['night']])
+        ax.set_title('Commit Activity by Time of Day')
+        ax.set_ylabel('Number of Commits')
+        plots['commit_time_distribution'] = self._fig_to_png_bytes(fig)
 
         # 3. Quarterly Activity Timeline
-        plt.figure(figsize=(12, 4))
+        fig.clear()
+        ax = fig.add_subplot()
         quarters = analysis['activity_patterns']['updates_per_quarter']
-        plt.plot(list(quarters.keys()), list(quarters.values()), marker='o')
-        plt.title('Repository Updates by Quarter')
-        plt.xticks(rotation=45)
-        plt.ylabel('Number of Updates')
-        plots['quarterly_activity'] = self._fig_to_base64()
+        ax.plot(list(quarters.keys()), list(quarters.values()), marker='o')
+        ax.set_title('Repository Updates by Quarter')
+        ax.tick_params(axis='x', rotation=45)
+        ax.set_ylabel('Number of Updates')
+        plots['quarterly_activity'] = self._fig_to_png_bytes(fig)
 
         # 4. Repository Size Distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot(data=[repo['size'] for repo in analysis['repository_stats']['repos']], bins=30)
-        plt.title('Repository Size Distribution')
-        plt.xlabel('Size (KB)')
-        plt.ylabel('Count')
-        plots['repo_size_distribution'] = self._fig_to_base64()
+        fig.clear()
+        ax = fig.add_subplot()
+        fig.set_size_inches(10, 6)
+        sns.histplot(data=analysis['repository_stats']['repo_sizes'], bins=30, ax=ax)
+        ax.set_title('Repository Size Distribution')
+        ax.set_xlabel('Size (KB)')
+        ax.set_ylabel('Count')
+        plots['repo_size_distribution'] = self._fig_to_png_bytes(fig)
 
+        plt.close(fig)
         return plots
 
-    def _fig_to_base64(self) -> str:
-        """Convert matplotlib figure to base64 string"""
+    def _fig_to_png_bytes(self, fig: plt.Figure) -> PNGImage:
+        """Render a matplotlib figure to PNG bytes"""
         buf = BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        return base64.b64encode(buf.getvalue()).decode('utf-8')
+        fig.savefig(buf, format='png', bbox_inches='tight', dpi=80,
+                    pil_kwargs={'optimize': True})
+        return PNGImage(buf.getvalue())
+
+    @staticmethod
+    def _format_dict(data: Dict[str, Any]) -> str:
+        """Format a mapping as one "key: value" line per entry"""
+        return "\n".join(f"{key}: {value}" for key, value in data.items())
 
-    def generate_report(self, username: str) -> Tuple[str, Dict[str, str]]:
+    def generate_report(self, username: str) -> Tuple[str, Dict[str, PNGImage]]:
         """
         Generate a formatted report and visualizations of the profile analysis.
         
@@ -239,57 +669,71 @@ class GitHubProfileAnalyzer:
         analysis = self.analyze_profile(username)
         visualizations = self.generate_visualizations(analysis)
         
-        report = f"""GitHub Profile Analysis for {username}
+        user_info = analysis['user_info']
+        repo_stats = analysis['repository_stats']
+        activity = analysis['activity_patterns']
+        frequency = activity['commit_frequency']
+
+        parts = []
+        parts.append(f"""GitHub Profile Analysis for {username}
 {'=' * 50}
 
-User Information:
+""")
+        parts.append(f"""User Information:
 ----------------
-Name: {analysis['user_info']['name']}
-Bio: {analysis['user_info']['bio']}
-Location: {analysis['user_info']['location']}
-Company: {analysis['user_info']['company']}
-Blog: {analysis['user_info']['blog']}
-Followers: {analysis['user_info']['followers']}
-Following: {analysis['user_info']['following']}
-Public Repositories: {analysis['user_info']['public_repos']}
-Account Created: {analysis['user_info']['account_created']}
-
-Repository Statistics:
+Name: {user_info['name']}
+Bio: {user_info['bio']}
+Location: {user_info['location']}
+Company: {user_info['company']}
+Blog: {user_info['blog']}
+Followers: {user_info['followers']}
+Following: {user_info['following']}
+Public Repositories: {user_info['public_repos']}
+Account Created: {user_info['account_created']}
+
+""")
+        parts.append(f"""Repository Statistics:
 -------------------
-Total Repositories: {analysis['repository_stats']['total_repos']}
-Total Stars: {analysis['repository_stats']['total_stars']}
-Total Forks: {analysis['repository_stats']['total_forks']}
-Total Watchers: {analysis['repository_stats']['total_watchers']}
-Average Stars per Repository: {analysis['repository_stats']['avg_stars_per_repo']:.1f}
-Average Repository Size: {analysis['repository_stats']['avg_repo_size']:.1f} KB
-Median Repository Size: {analysis['repository_stats']['median_repo_size']:.1f} KB
-
-Top Languages:
+Total Repositories: {repo_stats['total_repos']}
+Total Stars: {repo_stats['total_stars']}
+Total Forks: {repo_stats['total_forks']}
+Total Watchers: {repo_stats['total_watchers']}
+Average Stars per Repository: {repo_stats['avg_stars_per_repo']:.1f}
+Average Repository Size: {repo_stats['avg_repo_size']:.1f} KB
+Median Repository Size: {repo_stats['median_repo_size']:.1f} KB
+
+""")
+        parts.append(f"""Top Languages:
 ------------
-{self._format_dict(analysis['repository_stats']['top_languages'])}
+{self._format_dict(repo_stats['top_languages'])}
 
-License Usage:
+""")
+        parts.append(f"""License Usage:
 ------------
-{self._format_dict(analysis['repository_stats']['licenses'])}
+{self._format_dict(repo_stats['licenses'])}
 
-Activity Patterns:
+""")
+        parts.append(f"""Activity Patterns:
 ---------------
-Newest Repository: {analysis['activity_patterns']['newest_repo']}
-Oldest Repository: {analysis['activity_patterns']['oldest_repo']}
-Last Update: {analysis['activity_patterns']['last_update']}
+Newest Repository: {activity['newest_repo']}
+Oldest Repository: {activity['oldest_repo']}
+Last Update: {activity['last_update']}
 
-Commit Patterns:
+""")
+        parts.append(f"""Commit Patterns:
 -------------
-Favorite Commit Hours: {', '.join(f"{hour}:00 ({count} commits)" for hour, count in analysis['activity_patterns']['favorite_commit_hours'])}
-Favorite Commit Days: {', '.join(f"{calendar.day_name[day]} ({count} commits)" for day, count in analysis['activity_patterns']['favorite_commit_days'])}
+Favorite Commit Hours: {', '.join(f"{hour}:00 ({count} commits)" for hour, count in activity['favorite_commit_hours'])}
+Favorite Commit Days: {', '.join(f"{DAY_NAMES[day]} ({count} commits)" for day, count in activity['favorite_commit_days'])}
 
-Time of Day Distribution:
+""")
+        parts.append(f"""Time of Day Distribution:
 ----------------------
-Morning (5-12): {analysis['activity_patterns']['commit_frequency']['morning']} commits
-Afternoon (12-17): {analysis['activity_patterns']['commit_frequency']['afternoon']} commits
-Evening (17-22): {analysis['activity_patterns']['commit_frequency']['evening']} commits
-Night (22-5): {analysis['activity_patterns']['commit_frequency']['night']} commits
-"""
+Morning (5-12): {frequency['morning']} commits
+Afternoon (12-17): {frequency['afternoon']} commits
+Evening (17-22): {frequency['evening']} commits
+Night (22-5): {frequency['night']} commits
+""")
+        report = "".join(parts)
         return report, visualizations
 
 # Example usage
@@ -0,0 +1,425 @@
+import base64
+import importlib.util
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import github_profile_analyzer
+from github_profile_analyzer import GitHubProfileAnalyzer
+
+API = 'https://api.github.com'
+PAGE_PARAMS = {'per_page': 100}
+
+
+class FakeResponse:
+    def __init__(self, body=None, status_code=200, headers=None, links=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.links = links or {}
+        self.content = json.dumps(body).encode() if body is not None else b''
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error', response=self)
+
+
+class FakeSession:
+    """Serves canned responses keyed by the full request URL"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, params=None, headers=None):
+        key = requests.Request('GET', url, params=params).prepare().url
+        self.calls.append((key, dict(headers or {})))
+        route = self.routes[key]
+        return route.pop(0) if isinstance(route, list) else route
+
+    def post(self, url, json=None, headers=None):
+        self.calls.append((url, dict(headers or {})))
+        self.posted = json
+        return self.routes[url]
+
+
+def page_url(url, page, **params):
+    return requests.Request('GET', url, params={**params, 'page': page, **PAGE_PARAMS}).prepare().url
+
+
+def make_analyzer(routes, **kwargs):
+    analyzer = GitHubProfileAnalyzer(cache_path=kwargs.pop('cache_path', None), **kwargs)
+    analyzer.session = FakeSession(routes)
+    return analyzer
+
+
+def commit(date):
+    return {'sha': date, 'commit': {'author': {'date': date}}}
+
+
+def test_pagination_fans_out_to_last_page_in_order():
+    url = f'{API}/repos/octocat/hello/commits'
+    analyzer = make_analyzer({
+        page_url(url, 1): FakeResponse([1, 2], links={'next': {'url': page_url(url, 2)},
+                                                      'last': {'url': page_url(url, 3)}}),
+        page_url(url, 2): FakeResponse([3, 4]),
+        page_url(url, 3): FakeResponse([5]),
+    })
+
+    assert analyzer._get_paginated(url) == [1, 2, 3, 4, 5]
+    assert len(analyzer.session.calls) == 3
+
+
+def test_pagination_follows_next_links_without_trailing_request():
+    url = f'{API}/users/octocat/repos'
+    params = {'type': 'owner', 'sort': 'updated', 'direction': 'desc'}
+    second = f'{url}?after=abc'
+    analyzer = make_analyzer({
+        page_url(url, 1, **params): FakeResponse([{'name': 'a'}], links={'next': {'url': second}}),
+        second: FakeResponse([{'name': 'b'}]),
+    })
+
+    assert [repo['name'] for repo in analyzer.get_user_repos('octocat')] == ['a', 'b']
+    assert len(analyzer.session.calls) == 2
+
+
+def test_empty_repository_has_no_commits():
+    url = f'{API}/repos/octocat/empty/commits'
+    analyzer = make_analyzer({page_url(url, 1): FakeResponse({'message': 'Git Repository is empty.'},
+                                                             status_code=409)})
+
+    assert analyzer.get_repo_commits('octocat', 'empty') == []
+
+
+def test_other_http_errors_propagate():
+    url = f'{API}/repos/octocat/missing/commits'
+    analyzer = make_analyzer({page_url(url, 1): FakeResponse({'message': 'Not Found'}, status_code=404)})
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        analyzer.get_repo_commits('octocat', 'missing')
+
+
+def test_commit_transform_is_applied_to_every_page():
+    url = f'{API}/repos/octocat/hello/commits'
+    analyzer = make_analyzer({
+        page_url(url, 1): FakeResponse([commit('2024-01-01T10:00:00Z'), {'commit': {'author': {}}}],
+                                       links={'last': {'url': page_url(url, 2)}}),
+        page_url(url, 2): FakeResponse([commit('2024-01-02T11:00:00Z')]),
+    })
+
+    dates = analyzer.get_repo_commits('octocat', 'hello', transform=analyzer._commit_dates)
+    assert dates == ['2024-01-01T10:00:00Z', '2024-01-02T11:00:00Z']
+
+
+def test_non_json_body_raises_request_exception():
+    url = f'{API}/users/octocat'
+    analyzer = make_analyzer({url: FakeResponse()})
+    analyzer.session.routes[url].content = b'<html>Bad gateway</html>'
+
+    with pytest.raises(requests.exceptions.JSONDecodeError) as excinfo:
+        analyzer.get_user_info('octocat')
+    assert isinstance(excinfo.value, requests.exceptions.RequestException)
+
+
+def test_not_modified_is_served_from_cache(tmp_path):
+    url = f'{API}/users/octocat'
+    user = {'login': 'octocat', 'name': 'The Octocat'}
+    analyzer = make_analyzer({url: [FakeResponse(user, headers={'ETag': '"v1"'}),
+                                    FakeResponse(status_code=304)]},
+                             cache_path=str(tmp_path / 'cache'))
+
+    assert analyzer.get_user_info('octocat') == user
+    assert analyzer.get_user_info('octocat') == user
+    first, second = analyzer.session.calls
+    assert 'If-None-Match' not in first[1]
+    assert second[1]['If-None-Match'] == '"v1"'
+    analyzer.close()
+
+
+def test_cache_persists_across_analyzers(tmp_path):
+    url = f'{API}/users/octocat'
+    cache_path = str(tmp_path / 'cache')
+    user = {'login': 'octocat'}
+    first = make_analyzer({url: FakeResponse(user, headers={'ETag': '"v1"'})}, cache_path=cache_path)
+    first.get_user_info('octocat')
+    first.close()
+
+    second = make_analyzer({url: FakeResponse(status_code=304)}, cache_path=cache_path)
+    assert second.get_user_info('octocat') == user
+    second.close()
+
+
+def test_second_analyzer_on_a_held_cache_runs_uncached(tmp_path):
+    url = f'{API}/users/octocat'
+    cache_path = str(tmp_path / 'cache')
+    first = make_analyzer({url: FakeResponse({'login': 'octocat'}, headers={'ETag': '"v1"'})},
+                          cache_path=cache_path)
+    first.get_user_info('octocat')
+    second = make_analyzer({url: FakeResponse({'login': 'octocat'}, headers={'ETag': '"v2"'})},
+                           cache_path=cache_path)
+
+    assert second.get_user_info('octocat') == {'login': 'octocat'}
+    assert 'If-None-Match' not in second.session.calls[0][1]
+    first.close()
+    second.close()
+
+
+def test_unopenable_cache_does_not_fail_requests(tmp_path):
+    url = f'{API}/users/octocat'
+    analyzer = make_analyzer({url: FakeResponse({'login': 'octocat'}, headers={'ETag': '"v1"'})},
+                             cache_path=str(tmp_path / 'missing' / 'cache'))
+
+    assert analyzer.get_user_info('octocat') == {'login': 'octocat'}
+    analyzer.close()
+
+
+def test_transformed_pages_are_cached_in_trimmed_form(tmp_path):
+    url = f'{API}/repos/octocat/hello/commits'
+    analyzer = make_analyzer({page_url(url, 1): [FakeResponse([commit('2024-01-01T10:00:00Z')],
+                                                              headers={'ETag': '"c1"'}),
+                                                 FakeResponse(status_code=304)]},
+                             cache_path=str(tmp_path / 'cache'))
+
+    for _ in range(2):
+        assert analyzer.get_repo_commits('octocat', 'hello', transform=analyzer._commit_dates) \
+            == ['2024-01-01T10:00:00Z']
+    with analyzer._cache_lock:
+        assert list(analyzer._open_cache().values()) == [('"c1"', ['2024-01-01T10:00:00Z'], {})]
+    analyzer.close()
+
+
+def test_rate_limited_request_is_retried(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(github_profile_analyzer.time, 'sleep', sleeps.append)
+    url = f'{API}/users/octocat'
+    analyzer = make_analyzer({url: [FakeResponse({'message': 'slow down'}, status_code=429,
+                                                 headers={'Retry-After': '7'}),
+                                    FakeResponse({'login': 'octocat'})]})
+
+    assert analyzer.get_user_info('octocat') == {'login': 'octocat'}
+    assert sleeps == [7]
+
+
+def test_rate_limit_does_not_sleep_after_last_attempt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(github_profile_analyzer.time, 'sleep', sleeps.append)
+    url = f'{API}/users/octocat'
+    throttled = FakeResponse({'message': 'slow down'}, status_code=429, headers={'Retry-After': '7'})
+    analyzer = make_analyzer({url: throttled})
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        analyzer.get_user_info('octocat')
+    assert len(analyzer.session.calls) == analyzer.max_retries
+    assert sleeps == [7] * (analyzer.max_retries - 1)
+
+
+def test_distant_rate_limit_reset_raises_without_waiting(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(github_profile_analyzer.time, 'sleep', sleeps.append)
+    url = f'{API}/users/octocat'
+    reset = str(int(github_profile_analyzer.time.time()) + 3600)
+    analyzer = make_analyzer({url: FakeResponse({'message': 'API rate limit exceeded'}, status_code=403,
+                                                headers={'X-RateLimit-Remaining': '0',
+                                                         'X-RateLimit-Reset': reset})})
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        analyzer.get_user_info('octocat')
+    assert len(analyzer.session.calls) == 1
+    assert sleeps == []
+
+
+def test_forbidden_without_rate_limit_headers_is_not_retried():
+    url = f'{API}/users/octocat'
+    analyzer = make_analyzer({url: FakeResponse({'message': 'Forbidden'}, status_code=403,
+                                                headers={'X-RateLimit-Remaining': '42'})})
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        analyzer.get_user_info('octocat')
+    assert len(analyzer.session.calls) == 1
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('5', 5),
+    ('Thu, 01 Jan 1970 00:00:00 GMT', 0),
+    ('soon', None),
+    (None, None),
+])
+def test_parse_retry_after(value, expected):
+    assert GitHubProfileAnalyzer._parse_retry_after(value) == expected
+
+
+def test_graphql_commit_dates_are_normalized_to_utc():
+    history = {'history': {'nodes': [{'authoredDate': '2024-03-01T23:30:00+02:00'},
+                                     {'authoredDate': '2024-03-02T08:00:00Z'}]}}
+    body = {'data': {'repositoryOwner': {'repositories': {'nodes': [
+        {'name': 'hello', 'defaultBranchRef': {'target': history}},
+        {'name': 'empty', 'defaultBranchRef': None},
+    ]}}}}
+    analyzer = make_analyzer({f'{API}/graphql': FakeResponse(body)}, github_token='secret')
+
+    dates = analyzer.get_commit_dates('octocat', repos=[])
+    assert list(dates) == [pd.Timestamp('2024-03-01 21:30:00'), pd.Timestamp('2024-03-02 08:00:00')]
+    assert analyzer.session.posted['variables'] == {'login': 'octocat', 'count': 5}
+    assert 'privacy: PUBLIC' in analyzer.session.posted['query']
+
+
+def test_graphql_commit_dates_for_organization():
+    history = {'history': {'nodes': [{'authoredDate': '2024-05-06T14:00:00Z'}]}}
+    body = {'data': {'repositoryOwner': {'repositories': {'nodes': [
+        {'name': 'sdk', 'defaultBranchRef': {'target': history}},
+    ]}}}}
+    analyzer = make_analyzer({f'{API}/graphql': FakeResponse(body)}, github_token='secret')
+
+    dates = analyzer.get_commit_dates('github', repos=[])
+    assert list(dates) == [pd.Timestamp('2024-05-06 14:00:00')]
+    assert 'repositoryOwner(login: $login)' in analyzer.session.posted['query']
+    assert 'user(login' not in analyzer.session.posted['query']
+
+
+def test_graphql_unknown_owner_has_no_commits():
+    analyzer = make_analyzer({f'{API}/graphql': FakeResponse({'data': {'repositoryOwner': None}})},
+                             github_token='secret')
+
+    assert len(analyzer.get_commit_dates('nobody', repos=[])) == 0
+
+
+def test_graphql_errors_raise():
+    body = {'data': None, 'errors': [{'message': 'Could not resolve to a User'}]}
+    analyzer = make_analyzer({f'{API}/graphql': FakeResponse(body)}, github_token='secret')
+
+    with pytest.raises(requests.exceptions.RequestException, match='Could not resolve'):
+        analyzer.get_commit_dates('nobody', repos=[])
+
+
+def test_anonymous_commit_dates_use_most_starred_repos():
+    repos = [{'name': name, 'stargazers_count': stars}
+             for name, stars in [('a', 1), ('b', 9), ('c', 5)]]
+    analyzer = make_analyzer({
+        page_url(f'{API}/repos/octocat/b/commits', 1): FakeResponse([commit('2024-01-01T10:00:00Z')]),
+        page_url(f'{API}/repos/octocat/c/commits', 1): FakeResponse([commit('2024-01-02T11:00:00Z')]),
+    })
+
+    dates = analyzer.get_commit_dates('octocat', repos, limit=2)
+    assert sorted(dates) == [pd.Timestamp('2024-01-01 10:00:00'), pd.Timestamp('2024-01-02 11:00:00')]
+
+
+def test_visualizations_render_each_plot_on_fresh_axes(monkeypatch):
+    analysis = {
+        'repository_stats': {'top_languages': {'Python': 5, 'C': 3},
+                             'repo_sizes': [10, 200, 3000, 45]},
+        'activity_patterns': {'commit_frequency': {'morning': 10, 'afternoon': 20,
+                                                   'evening': 5, 'night': 2},
+                              'updates_per_quarter': {'2023-Q1': 2, '2023-Q2': 4}},
+    }
+    analyzer = make_analyzer({})
+    axes_state = []
+    render = analyzer._fig_to_png_bytes
+
+    def recording_render(fig):
+        ax, = fig.axes
+        axes_state.append((ax.get_aspect(), ax.get_frame_on(),
+                           [label.get_rotation() for label in ax.get_xticklabels()]))
+        return render(fig)
+
+    monkeypatch.setattr(analyzer, '_fig_to_png_bytes', recording_render)
+    plots = analyzer.generate_visualizations(analysis)
+
+    assert list(plots) == ['language_distribution', 'commit_time_distribution',
+                           'quarterly_activity', 'repo_size_distribution']
+    assert all(image.startswith(b'\x89PNG') for image in plots.values())
+    for (aspect, frame_on, rotations), name in zip(axes_state[1:], list(plots)[1:]):
+        assert aspect == 'auto' and frame_on, name
+    assert set(axes_state[3][2]) == {0.0}
+
+
+def make_repos(count):
+    languages = ['Python', 'C', None, 'Go', 'Python', 'Rust']
+    licenses = [{'name': 'MIT License'}, None, {'name': 'Apache License 2.0'}]
+    return [{
+        'name': f'repo{i}',
+        'stargazers_count': i % 7,
+        'forks_count': i % 3,
+        'watchers_count': i % 7,
+        'size': (i * 37) % 1000,
+        'language': languages[i % len(languages)],
+        'license': licenses[i % len(licenses)],
+        'created_at': f'{2015 + i % 9}-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00Z',
+        'updated_at': f'{2020 + i % 5}-{1 + (i * 5) % 12:02d}-{1 + i % 28:02d}T12:30:00Z',
+    } for i in range(count)]
+
+
+@pytest.mark.parametrize('count', [1, 2, 31, 64])
+def test_small_and_large_repo_summaries_agree(monkeypatch, count):
+    analyzer = make_analyzer({})
+    repos = make_repos(count)
+    small = analyzer._summarize_repos(repos)
+    monkeypatch.setattr(github_profile_analyzer, 'SMALL_REPO_THRESHOLD', 0)
+    large = analyzer._summarize_repos(repos)
+
+    assert list(small.pop('repo_sizes')) == large.pop('repo_sizes').tolist()
+    assert small.pop('avg_repo_size') == pytest.approx(large.pop('avg_repo_size'))
+    assert small == large
+
+
+def test_most_common_orders_by_count_then_bin():
+    histogram = np.array([0, 4, 2, 4, 0, 1, 2])
+
+    assert GitHubProfileAnalyzer._most_common(histogram) == [(1, 4), (3, 4), (2, 2), (6, 2), (5, 1)]
+    assert GitHubProfileAnalyzer._most_common(histogram, 3) == [(1, 4), (3, 4), (2, 2)]
+    assert GitHubProfileAnalyzer._most_common(np.zeros(24, dtype=np.int64), 3) == []
+
+
+def test_most_common_matches_counter_counts():
+    hours = [9, 14, 9, 23, 14, 9, 2, 23]
+    histogram = np.bincount(hours, minlength=24)
+
+    expected = sorted(Counter(hours).items(), key=lambda item: (-item[1], item[0]))
+    assert GitHubProfileAnalyzer._most_common(histogram) == expected
+    assert all(isinstance(value, int) for pair in GitHubProfileAnalyzer._most_common(histogram)
+               for value in pair)
+
+
+def test_png_image_str_is_base64_of_raw_bytes():
+    raw = b'\x89PNG\r\n\x1a\n' + bytes(range(256))
+    image = github_profile_analyzer.PNGImage(raw)
+
+    assert image == raw
+    assert str(image) == base64.b64encode(raw).decode('ascii')
+    assert f'{image}' == str(image)
+
+
+def load_without_numba(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'numba', None)
+    spec = importlib.util.spec_from_file_location('github_profile_analyzer_no_numba',
+                                                  github_profile_analyzer.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize('kernel', ['active', 'fallback'])
+def test_hist_times_matches_counter(monkeypatch, kernel):
+    module = load_without_numba(monkeypatch) if kernel == 'fallback' else github_profile_analyzer
+    rng = np.random.default_rng(0)
+    hours = rng.integers(0, 24, size=500).astype(np.int8)
+    days = rng.integers(0, 7, size=500).astype(np.int8)
+
+    hour_hist, day_hist = module._hist_times(hours, days)
+    hour_counts = Counter(hours.tolist())
+    day_counts = Counter(days.tolist())
+    assert hour_hist.tolist() == [hour_counts[hour] for hour in range(24)]
+    assert day_hist.tolist() == [day_counts[day] for day in range(7)]
+
+
+def test_hist_times_handles_no_commits():
+    hour_hist, day_hist = github_profile_analyzer._hist_times(np.empty(0, np.int8), np.empty(0, np.int8))
+
+    assert hour_hist.tolist() == [0] * 24
+    assert day_hist.tolist() == [0] * 7